@@ -10,22 +10,45 @@ Description:
 """
 
 import csv
+import errno
 import json
 import os
 import re
-import shutil
 import sys
 from datetime import datetime
-from difflib import SequenceMatcher, get_close_matches
-from typing import List, Dict, Optional
-from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import re2 as re_engine
+except ImportError:
+    re_engine = re
 
 CSV_FILE = "contacts.csv"
 JSON_FILE = "contacts.json"
+VCARD_FILE = "contacts.vcf"
 ERROR_LOG = "error_log.txt"
 BACKUP_DIR = "backups"
 PREV_SNAPSHOT = ".prev_contacts_snapshot.json"
+LAST_BACKUP_MARKER = os.path.join(BACKUP_DIR, ".last_backup_day")
 CSV_FIELDS = ["name", "phone", "email", "tags", "favorite"]
+IO_BUFFER_SIZE = 1 << 20
+
+# Rows of the name-similarity matrix computed per rapidfuzz.process.cdist call.
+SIMILARITY_BLOCK_ROWS = 256
+
+# YYYYMMDD of the newest backup; None until looked up, "" if there are none.
+_LAST_BACKUP_DAY = None
+
+# Parsed contents of CSV_FILE, keyed on (st_mtime_ns, st_size) of the file.
+# "index" maps lowercased name -> position of its first occurrence in "data";
+# "names", "blobs" (see search_blob) and "fields" (the searchable field values
+# as a tuple) are parallel to "data".
+_CACHE = {"key": None, "data": [], "index": {}, "names": [], "blobs": [], "fields": []}
 
 
 def log_error(operation: str, exc: Exception) -> None:
@@ -47,10 +70,78 @@ def safe_makedirs(path: str) -> None:
         log_error("safe_makedirs", e)
 
 
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL}
+
+
+def _clonefile(src: str, dst: str) -> bool:
+    """Clone src to dst with macOS clonefile(2); False if unsupported (e.g. not on APFS)."""
+    try:
+        import ctypes
+        clonefile = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True).clonefile
+    except (OSError, AttributeError):
+        return False
+    tmp = dst + ".clone"
+    if clonefile(os.fsencode(src), os.fsencode(tmp), 0) != 0:
+        return False
+    os.replace(tmp, dst)
+    return True
+
+
+def _copy_file_range(fsrc, fdst) -> bool:
+    """Copy with Linux copy_file_range(2), which reflinks on Btrfs/XFS; False if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+    count = max(os.fstat(src_fd).st_size, IO_BUFFER_SIZE)
+    try:
+        while os.copy_file_range(src_fd, dst_fd, count):
+            pass
+    except OSError as e:
+        if e.errno in _COPY_FALLBACK_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def copy_file(src: str, dst: str) -> None:
+    """Like shutil.copy2, but uses copy-on-write clones where the filesystem supports them."""
+    import shutil
+    if sys.platform == "darwin" and _clonefile(src, dst):
+        shutil.copystat(src, dst)
+        return
+    if sys.version_info >= (3, 14):
+        shutil.copy2(src, dst)
+        return
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if not _copy_file_range(fsrc, fdst):
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, length=IO_BUFFER_SIZE)
+    shutil.copystat(src, dst)
+
+
+def dump_json(path: str, data) -> None:
+    """Write data as UTF-8 JSON indented by 2, with orjson or the stdlib alike."""
+    if orjson is not None:
+        with open(path, "wb", buffering=IO_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_json(path: str):
+    if orjson is not None:
+        with open(path, "rb", buffering=IO_BUFFER_SIZE) as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+        return json.load(f)
+
+
 def snapshot_before_write(contacts: List[Dict[str, str]]) -> None:
     try:
-        with open(PREV_SNAPSHOT, "w", encoding="utf-8") as f:
-            json.dump(contacts, f, indent=2, ensure_ascii=False)
+        dump_json(PREV_SNAPSHOT, contacts)
     except Exception as e:
         log_error("snapshot_before_write", e)
 
@@ -59,8 +150,7 @@ def load_prev_snapshot() -> Optional[List[Dict[str, str]]]:
     try:
         if not os.path.isfile(PREV_SNAPSHOT):
             return None
-        with open(PREV_SNAPSHOT, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_json(PREV_SNAPSHOT)
     except Exception as e:
         log_error("load_prev_snapshot", e)
         return None
@@ -68,11 +158,17 @@ def load_prev_snapshot() -> Optional[List[Dict[str, str]]]:
 
 PHONE_RE = re.compile(r"^\+?\d{7,15}$")
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[a-zA-Z0-9]{2,}$")
+_NON_DIGIT_SUB = re.compile(r"\D").sub
 
 
 def normalize_phone(phone: str) -> str:
-    digits = re.sub(r"\D", "", phone or "")
-    return digits 
+    if not phone:
+        return ""
+    if phone.isdecimal():
+        return phone
+    if phone[0] == "+" and phone[1:].isdecimal():
+        return phone[1:]
+    return _NON_DIGIT_SUB("", phone)
 
 
 def is_valid_phone(phone: str) -> bool:
@@ -81,7 +177,20 @@ def is_valid_phone(phone: str) -> bool:
 
 
 def is_valid_email(email: str) -> bool:
-    return bool(EMAIL_RE.match(email or ""))
+    if not email or "@" not in email or "." not in email:
+        return False
+    return bool(EMAIL_RE.match(email))
+
+
+_TRUTHY = frozenset(("1", "true", "yes", "y", "True", "TRUE", "Yes", "YES", "Y"))
+
+
+def parse_favorite(value: str) -> bool:
+    if value in _TRUTHY:
+        return True
+    if not value or value == "0":
+        return False
+    return value.lower() in _TRUTHY
 
 
 def ensure_csv_exists() -> None:
@@ -95,72 +204,196 @@ def ensure_csv_exists() -> None:
             print("Unable to create contacts file. See error_log.txt for details.")
 
 
+def _csv_stat_key() -> Optional[tuple]:
+    try:
+        st = os.stat(CSV_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def build_name_index(contacts: List[Dict[str, str]]) -> Dict[str, int]:
+    index = {}
+    for i, c in enumerate(contacts):
+        index.setdefault(c.get("name", "").lower(), i)
+    return index
+
+
+def search_fields(c: Dict[str, str]) -> Tuple[str, str, str, str]:
+    return (c.get("name", ""), c.get("phone", ""), c.get("email", ""), c.get("tags", ""))
+
+
+def search_blob(c: Dict[str, str]) -> str:
+    """Lowercased searchable fields joined by newlines, so no match spans two fields."""
+    return "\n".join((c.get("name", ""), c.get("phone", ""), c.get("email", ""), c.get("tags", ""))).lower()
+
+
+def _as_parsed(c: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """The contact as read_contacts() would return it after writing it out, or None if it would be skipped."""
+    contact = {k: str(c.get(k) or "").strip() for k in ("name", "phone", "email", "tags")}
+    if not contact["name"]:
+        return None
+    contact["favorite"] = bool(c.get("favorite"))
+    return contact
+
+
+def _store_cache(contacts: List[Dict[str, str]], key: Optional[tuple] = None) -> None:
+    data = [p for p in map(_as_parsed, contacts) if p is not None]
+    _CACHE["key"] = key if key is not None else _csv_stat_key()
+    _CACHE["data"] = data
+    _CACHE["index"] = build_name_index(data)
+    _CACHE["names"] = [c["name"] for c in data]
+    _CACHE["blobs"] = [search_blob(c) for c in data]
+    _CACHE["fields"] = [search_fields(c) for c in data]
+
+
+def _cache_append(contact: Dict[str, str]) -> None:
+    contact = _as_parsed(contact)
+    if contact is None:
+        return
+    _CACHE["index"].setdefault(contact["name"].lower(), len(_CACHE["data"]))
+    _CACHE["data"].append(contact)
+    _CACHE["names"].append(contact["name"])
+    _CACHE["blobs"].append(search_blob(contact))
+    _CACHE["fields"].append(search_fields(contact))
+
+
+def _reset_cache() -> None:
+    _CACHE["key"] = None
+    _CACHE["data"] = []
+    _CACHE["index"] = {}
+    _CACHE["names"] = []
+    _CACHE["blobs"] = []
+    _CACHE["fields"] = []
+
+
+def _parse_contacts(reader: csv.DictReader) -> List[Dict[str, str]]:
+    contacts = []
+    for row in reader:
+        contact = {k: (row.get(k, "").strip() if row.get(k, "") is not None else "") for k in CSV_FIELDS}
+        if contact.get("name"):
+            contact["tags"] = contact.get("tags", "")
+            contact["favorite"] = parse_favorite(contact.get("favorite", ""))
+            contacts.append(contact)
+    return contacts
+
+
 def read_contacts() -> List[Dict[str, str]]:
+    key = _csv_stat_key()
+    if key is not None and key == _CACHE["key"]:
+        return [dict(c) for c in _CACHE["data"]]
     contacts = []
     try:
-        with open(CSV_FILE, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                contact = {k: (row.get(k, "").strip() if row.get(k, "") is not None else "") for k in CSV_FIELDS}
-                if contact.get("name"):
-                    contact["tags"] = contact.get("tags", "")
-                    contact["favorite"] = contact.get("favorite", "").strip().lower() in ("1", "true", "yes", "y")
-                    contacts.append(contact)
+        with open(CSV_FILE, "r", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+            contacts = _parse_contacts(csv.DictReader(f))
+        _store_cache(contacts, key)
     except FileNotFoundError:
-        pass
+        _reset_cache()
     except Exception as e:
+        _reset_cache()
         log_error("read_contacts", e)
         print("Error reading contacts. See error_log.txt for details.")
     return contacts
 
 
-def write_contacts(contacts: List[Dict[str, str]]) -> None:
-    try:
-        safe_makedirs(BACKUP_DIR)
+def _csv_row(c: Dict[str, str]) -> Tuple[str, str, str, str, str]:
+    """Row values in CSV_FIELDS order."""
+    return (
+        c.get("name", ""),
+        c.get("phone", ""),
+        c.get("email", ""),
+        c.get("tags", ""),
+        "1" if c.get("favorite") else "0",
+    )
+
+
+def last_backup_day() -> str:
+    """Day of the newest backup, from memory, then LAST_BACKUP_MARKER, then a one-off scan of BACKUP_DIR."""
+    global _LAST_BACKUP_DAY
+    if _LAST_BACKUP_DAY is None:
         try:
-            old = read_contacts()
-            snapshot_before_write(old)
+            with open(LAST_BACKUP_MARKER, "r", encoding="utf-8") as f:
+                _LAST_BACKUP_DAY = f.read().strip() or None
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            log_error("snapshot_before_write_in_write_contacts", e)
-
-        today_str = datetime.now().strftime("%Y%m%d")
-        existing_for_today = False
+            log_error("read_last_backup_marker", e)
+    if _LAST_BACKUP_DAY is None:
+        prefix = "contacts_backup_"
+        newest = ""
         try:
-            for fname in os.listdir(BACKUP_DIR):
-                if fname.startswith(f"contacts_backup_{today_str}_") and fname.endswith(".csv"):
-                    existing_for_today = True
-                    break
+            with os.scandir(BACKUP_DIR) as it:
+                for entry in it:
+                    if entry.name.startswith(prefix) and entry.name.endswith(".csv"):
+                        newest = max(newest, entry.name[len(prefix):len(prefix) + 8])
         except FileNotFoundError:
-            existing_for_today = False
+            pass
         except Exception as e:
             log_error("check_existing_backups", e)
+        _LAST_BACKUP_DAY = newest
+    return _LAST_BACKUP_DAY
 
-        if not existing_for_today and os.path.isfile(CSV_FILE):
-            try:
-                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-                shutil.copy2(CSV_FILE, os.path.join(BACKUP_DIR, f"contacts_backup_{ts}.csv"))
-            except Exception as e:
-                log_error("create_daily_backup", e)
-            
-        with open(CSV_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            writer.writeheader()
-            for c in contacts:
-                row = {
-                    "name": c.get("name", ""),
-                    "phone": c.get("phone", ""),
-                    "email": c.get("email", ""),
-                    "tags": c.get("tags", ""),
-                    "favorite": "1" if c.get("favorite") else "0",
-                }
-                writer.writerow(row)
+
+def mark_backup_day(day: str) -> None:
+    global _LAST_BACKUP_DAY
+    _LAST_BACKUP_DAY = day
+    try:
+        with open(LAST_BACKUP_MARKER, "w", encoding="utf-8") as f:
+            f.write(day)
     except Exception as e:
+        log_error("write_last_backup_marker", e)
+
+
+def prepare_write(prev: Optional[List[Dict[str, str]]] = None) -> None:
+    """Snapshot the current contacts for undo and take the daily backup, before CSV_FILE changes."""
+    safe_makedirs(BACKUP_DIR)
+    try:
+        if prev is not None:
+            old = prev
+        elif _CACHE["key"] is not None and _CACHE["key"] == _csv_stat_key():
+            old = _CACHE["data"]
+        else:
+            old = read_contacts()
+        snapshot_before_write(old)
+    except Exception as e:
+        log_error("snapshot_before_write_in_write_contacts", e)
+
+    today_str = datetime.now().strftime("%Y%m%d")
+    existing_for_today = last_backup_day() == today_str
+
+    if not existing_for_today and os.path.isfile(CSV_FILE):
+        try:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            copy_file(CSV_FILE, os.path.join(BACKUP_DIR, f"contacts_backup_{ts}.csv"))
+            mark_backup_day(today_str)
+        except Exception as e:
+            log_error("create_daily_backup", e)
+
+
+def write_contacts(contacts: List[Dict[str, str]], prev: Optional[List[Dict[str, str]]] = None) -> None:
+    """Overwrite CSV_FILE with contacts; prev is the pre-mutation list used for the undo snapshot."""
+    try:
+        prepare_write(prev)
+        with open(CSV_FILE, "w", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            writer.writerows(map(_csv_row, contacts))
+        _store_cache(contacts)
+    except Exception as e:
+        _reset_cache()
         log_error("write_contacts", e)
         print("Error saving contacts. See error_log.txt for details.")
 
 
 
 
+def compile_search_regex(pattern: str):
+    """Compile a user search pattern, with RE2 (linear time) when available."""
+    if re_engine is re:
+        return re.compile(pattern, re.IGNORECASE)
+    return re_engine.compile("(?i)" + pattern)
+
+
 def display_contacts(contacts: List[Dict[str, str]], sort_by: str = "name") -> None:
     if not contacts:
         print("\nNo contacts found.\n")
@@ -168,11 +401,21 @@ def display_contacts(contacts: List[Dict[str, str]], sort_by: str = "name") -> N
     if sort_by in ("name", "phone", "email"):
         contacts = sorted(contacts, key=lambda x: (x.get(sort_by) or "").lower())
     elif sort_by == "favorite":
-        contacts = sorted(contacts, key=lambda x: not bool(x.get("favorite")))
-    name_w = max(len("Name"), *(len(c.get("name", "")) for c in contacts))
-    phone_w = max(len("Phone"), *(len(c.get("phone", "")) for c in contacts))
-    email_w = max(len("Email"), *(len(c.get("email", "")) for c in contacts))
-    tags_w = max(len("Tags"), *(len(c.get("tags", "")) for c in contacts))
+        contacts = sorted(contacts, key=lambda x: not x.get("favorite"))
+    name_w, phone_w, email_w, tags_w = len("Name"), len("Phone"), len("Email"), len("Tags")
+    for c in contacts:
+        n = len(c.get("name", ""))
+        if n > name_w:
+            name_w = n
+        n = len(c.get("phone", ""))
+        if n > phone_w:
+            phone_w = n
+        n = len(c.get("email", ""))
+        if n > email_w:
+            email_w = n
+        n = len(c.get("tags", ""))
+        if n > tags_w:
+            tags_w = n
     header = f"{'Fav':3}\t{'Name':<{name_w}}\t{'Phone':<{phone_w}}\t{'Email':<{email_w}}\t{'Tags':<{tags_w}}"
     print()
     print(header)
@@ -183,11 +426,61 @@ def display_contacts(contacts: List[Dict[str, str]], sort_by: str = "name") -> N
     print()
 
 
-def find_by_name_exact(contacts: List[Dict[str, str]], name: str) -> Optional[Dict[str, str]]:
-    for c in contacts:
-        if c.get("name", "").lower() == name.lower():
-            return c
-    return None
+def find_by_name_exact(contacts: List[Dict[str, str]], name: str, index: Optional[Dict[str, int]] = None) -> Optional[Dict[str, str]]:
+    """Case-insensitive lookup; pass the index from build_name_index() to skip rebuilding it."""
+    if index is None:
+        index = build_name_index(contacts)
+    i = index.get(name.lower())
+    return contacts[i] if i is not None else None
+
+
+_RAPIDFUZZ = False  # not tried yet; None once the import has failed
+
+
+def _load_rapidfuzz():
+    """Return (fuzz, process) from rapidfuzz, or None when it is not installed."""
+    global _RAPIDFUZZ
+    if _RAPIDFUZZ is False:
+        try:
+            from rapidfuzz import fuzz, process
+            _RAPIDFUZZ = (fuzz, process)
+        except ImportError:
+            _RAPIDFUZZ = None
+    return _RAPIDFUZZ
+
+
+_CDIST = False  # not tried yet; None when rapidfuzz or numpy is missing
+
+
+def _load_cdist():
+    """Return (fuzz, process, numpy) for process.cdist scoring, or None unless both packages import."""
+    global _CDIST
+    if _CDIST is False:
+        _CDIST = None
+        rf = _load_rapidfuzz()
+        if rf is not None:
+            try:
+                import numpy
+                _CDIST = rf + (numpy,)
+            except ImportError:
+                pass
+    return _CDIST
+
+
+def merge_tags(a: str, b: str) -> str:
+    """Union of two comma-separated tag lists, stripped and sorted."""
+    parts = (t for t in map(str.strip, (a + "," + b).split(",")) if t)
+    return ",".join(sorted(dict.fromkeys(parts)))
+
+
+def merge_into(target: Dict[str, str], src: Dict[str, str]) -> None:
+    """Fill target's missing phone/email from src and combine tags and favorite."""
+    if not target.get("phone") and src.get("phone"):
+        target["phone"] = src["phone"]
+    if not target.get("email") and src.get("email"):
+        target["email"] = src["email"]
+    target["tags"] = merge_tags(target.get("tags",""), src.get("tags",""))
+    target["favorite"] = target.get("favorite") or src.get("favorite")
 
 
 def add_contact_interactive() -> None:
@@ -207,26 +500,28 @@ def add_contact_interactive() -> None:
             print("Warning: email looks invalid.")
         contact = {"name": name, "phone": phone_n, "email": email.strip(), "tags": tags, "favorite": fav}
         contacts = read_contacts()
-        names = [c["name"] for c in contacts]
-        close = get_close_matches(name, names, n=3, cutoff=0.85)
+        idx = _CACHE["index"]
+        prev = [dict(c) for c in contacts]
+        if name.lower() in idx:
+            close = [contacts[idx[name.lower()]]["name"]]
+        elif (rf := _load_rapidfuzz()) is not None:
+            fuzz, process = rf
+            close = [m for m, _, _ in process.extract(name, _CACHE["names"], scorer=fuzz.WRatio, limit=3, score_cutoff=85)]
+        else:
+            from difflib import get_close_matches
+            close = get_close_matches(name, _CACHE["names"], n=3, cutoff=0.85)
         if close:
             print("Similar existing names found:", ", ".join(close))
             choice = input("Type M to merge, A to add as new, or C to cancel [A]: ").strip().upper() or "A"
             if choice == "M":
-                target = find_by_name_exact(contacts, close[0]) or next((c for c in contacts if c["name"] == close[0]), None)
+                target = find_by_name_exact(contacts, close[0], idx)
                 if target:
-                    if not target.get("phone") and contact.get("phone"):
-                        target["phone"] = contact["phone"]
-                    if not target.get("email") and contact.get("email"):
-                        target["email"] = contact["email"]
-                    merged_tags = set(t.strip() for t in (target.get("tags","") + "," + contact.get("tags","")).split(",") if t.strip())
-                    target["tags"] = ",".join(sorted(merged_tags))
-                    target["favorite"] = target.get("favorite") or contact.get("favorite")
-                    write_contacts(contacts)
+                    merge_into(target, contact)
+                    write_contacts(contacts, prev)
                     print("Merged into existing contact.")
                     return
         contacts.append(contact)
-        write_contacts(contacts)
+        write_contacts(contacts, prev)
         print("Contact added successfully.")
     except Exception as e:
         log_error("add_contact_interactive", e)
@@ -240,22 +535,23 @@ def search_contacts() -> None:
             print("Empty query.")
             return
         contacts = read_contacts()
-        results = []
         if q.startswith("/") and q.endswith("/"):
             pattern = q[1:-1]
+            if not pattern:
+                print("Invalid regex: empty pattern")
+                return
             try:
-                rx = re.compile(pattern, re.IGNORECASE)
-            except re.error as e:
+                rx = compile_search_regex(pattern)
+            except (re.error, re_engine.error) as e:
                 print("Invalid regex:", e)
                 return
-            for c in contacts:
-                if rx.search(c.get("name","")) or rx.search(c.get("phone","")) or rx.search(c.get("email","")) or rx.search(c.get("tags","")):
-                    results.append(c)
+            search = rx.search
+            # Search each field on its own; on the joined blob, \s, \W or [^@]
+            # could match the separator and let a match run across fields.
+            results = [c for c, fields in zip(contacts, _CACHE["fields"]) if any(map(search, fields))]
         else:
             qs = q.lower()
-            for c in contacts:
-                if qs in (c.get("name","").lower() + c.get("phone","") + c.get("email","").lower() + c.get("tags","").lower()):
-                    results.append(c)
+            results = [c for c, blob in zip(contacts, _CACHE["blobs"]) if qs in blob]
         display_contacts(results)
     except Exception as e:
         log_error("search_contacts", e)
@@ -268,10 +564,11 @@ def update_contact_interactive() -> None:
         if not name:
             return
         contacts = read_contacts()
-        target = find_by_name_exact(contacts, name)
+        target = find_by_name_exact(contacts, name, _CACHE["index"])
         if not target:
             print("Contact not found.")
             return
+        prev = [dict(c) for c in contacts]
         print("Current:")
         display_contacts([target])
         new_phone = input(f"New phone (leave empty to keep '{target.get('phone','')}'): ").strip()
@@ -292,7 +589,7 @@ def update_contact_interactive() -> None:
             target["favorite"] = True
         elif fav in ("n", "no"):
             target["favorite"] = False
-        write_contacts(contacts)
+        write_contacts(contacts, prev)
         print("Contact updated.")
     except Exception as e:
         log_error("update_contact_interactive", e)
@@ -305,73 +602,158 @@ def delete_contact_interactive() -> None:
         if not name:
             return
         contacts = read_contacts()
-        remaining = [c for c in contacts if c.get("name","").lower() != name.lower()]
-        if len(remaining) == len(contacts):
+        key = name.lower()
+        i = _CACHE["index"].get(key)
+        if i is None:
             print("Not found.")
             return
-        write_contacts(remaining)
+        remaining = contacts[:i] + [c for c in contacts[i + 1:] if c.get("name","").lower() != key]
+        write_contacts(remaining, contacts)
         print(f"Deleted contact '{name}'.")
     except Exception as e:
         log_error("delete_contact_interactive", e)
         print("Delete failed. See error_log.txt for details.")
 
 
+def _csv_header() -> Optional[List[str]]:
+    """Header row of CSV_FILE, or None if the file is missing or empty."""
+    try:
+        with open(CSV_FILE, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+
+def _import_rows(f):
+    for row in csv.DictReader(f):
+        name = row.get("name","").strip()
+        if not name:
+            continue
+        yield {
+            "name": name,
+            "phone": normalize_phone(row.get("phone","")),
+            "email": (row.get("email","") or "").strip(),
+            "tags": row.get("tags","") or "",
+            "favorite": parse_favorite(str(row.get("favorite","")).strip())
+        }
+
+
 def bulk_import_csv() -> None:
     try:
         path = input("Path to CSV to import (will append): ").strip()
         if not path or not os.path.isfile(path):
             print("File not found.")
             return
-        with open(path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            incoming = []
-            for row in reader:
-                name = row.get("name","").strip()
-                if not name:
-                    continue
-                contact = {
-                    "name": name,
-                    "phone": normalize_phone(row.get("phone","")),
-                    "email": (row.get("email","") or "").strip(),
-                    "tags": row.get("tags","") or "",
-                    "favorite": str(row.get("favorite","")).strip() in ("1","true","yes","y")
-                }
-                incoming.append(contact)
-        if not incoming:
+        contacts = read_contacts()
+        header = _csv_header()
+        if header is not None and header != CSV_FIELDS:
+            # Appended rows are positional, so a foreign column order needs a full rewrite.
+            with open(path, "r", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+                incoming = list(_import_rows(f))
+            if not incoming:
+                print("No valid contacts in file.")
+                return
+            write_contacts(contacts + incoming, contacts)
+            print(f"Imported {len(incoming)} contacts.")
+            return
+        cached = _CACHE["key"] is not None
+        imported = 0
+        out = None
+        start = 0
+        try:
+            with open(path, "r", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+                for contact in _import_rows(f):
+                    if out is None:
+                        prepare_write(contacts)
+                        start = os.path.getsize(CSV_FILE) if os.path.isfile(CSV_FILE) else 0
+                        out = open(CSV_FILE, "a", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE)
+                        writer = csv.writer(out)
+                        if start == 0:
+                            writer.writerow(CSV_FIELDS)
+                        else:
+                            with open(CSV_FILE, "rb") as tail:
+                                tail.seek(start - 1)
+                                if tail.read(1) != b"\n":
+                                    out.write("\r\n")
+                    writer.writerow(_csv_row(contact))
+                    imported += 1
+                    if cached:
+                        _cache_append(contact)
+        except Exception:
+            # Leave contacts.csv exactly as it was before the import started.
+            if out is not None:
+                out.close()
+                out = None
+                os.truncate(CSV_FILE, start)
+            raise
+        finally:
+            if out is not None:
+                out.close()
+        if not imported:
             print("No valid contacts in file.")
             return
-        contacts = read_contacts()
-        contacts.extend(incoming)
-        write_contacts(contacts)
-        print(f"Imported {len(incoming)} contacts.")
+        if cached:
+            _CACHE["key"] = _csv_stat_key()
+        print(f"Imported {imported} contacts.")
     except Exception as e:
+        _reset_cache()
         log_error("bulk_import_csv", e)
-        print("Bulk import failed.")
+        print("Bulk import failed; no contacts were imported.")
+
+
+_VCF_SAFE = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-")
+_VCF_TRANS = bytes(b if b in _VCF_SAFE else ord("_") for b in range(256))
+
+
+def vcard_filename(name: str) -> str:
+    # Non-ASCII characters become "?" and then "_", one per character.
+    return name.encode("ascii", "replace").translate(_VCF_TRANS).decode("ascii") + ".vcf"
+
+
+def vcard_lines(c: Dict[str, str]) -> List[str]:
+    lines = ["BEGIN:VCARD\n", "VERSION:3.0\n", f"N:{c['name']}\n"]
+    if c.get("phone"):
+        lines.append(f"TEL;TYPE=CELL:{c['phone']}\n")
+    if c.get("email"):
+        lines.append(f"EMAIL;TYPE=INTERNET:{c['email']}\n")
+    lines.append("END:VCARD\n")
+    return lines
 
 
 def export_vcard_selected() -> None:
     try:
         name = input("Enter exact name to export to vCard: ").strip()
         contacts = read_contacts()
-        target = find_by_name_exact(contacts, name)
+        target = find_by_name_exact(contacts, name, _CACHE["index"])
         if not target:
             print("Not found.")
             return
-        filename = f"{re.sub(r'[^a-zA-Z0-9_-]', '_', target['name'])}.vcf"
+        filename = vcard_filename(target["name"])
         with open(filename, "w", encoding="utf-8") as f:
-            f.write("BEGIN:VCARD\nVERSION:3.0\n")
-            f.write(f"N:{target['name']}\n")
-            if target.get("phone"):
-                f.write(f"TEL;TYPE=CELL:{target['phone']}\n")
-            if target.get("email"):
-                f.write(f"EMAIL;TYPE=INTERNET:{target['email']}\n")
-            f.write("END:VCARD\n")
+            f.writelines(vcard_lines(target))
         print(f"Exported vCard to {filename}.")
     except Exception as e:
         log_error("export_vcard_selected", e)
         print("vCard export failed.")
 
 
+def export_all_vcards() -> None:
+    try:
+        contacts = read_contacts()
+        if not contacts:
+            print("No contacts to export.")
+            return
+        lines = []
+        for c in contacts:
+            lines.extend(vcard_lines(c))
+        with open(VCARD_FILE, "w", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
+            f.writelines(lines)
+        print(f"Exported {len(contacts)} contacts to {VCARD_FILE}.")
+    except Exception as e:
+        log_error("export_all_vcards", e)
+        print("vCard export failed.")
+
+
 def create_backup() -> None:
     try:
         safe_makedirs(BACKUP_DIR)
@@ -380,7 +762,8 @@ def create_backup() -> None:
             return
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         dst = os.path.join(BACKUP_DIR, f"contacts_backup_{ts}.csv")
-        shutil.copy2(CSV_FILE, dst)
+        copy_file(CSV_FILE, dst)
+        mark_backup_day(ts[:8])
         print(f"Backup created: {dst}")
     except Exception as e:
         log_error("create_backup", e)
@@ -389,8 +772,10 @@ def create_backup() -> None:
 
 def list_backups() -> List[str]:
     safe_makedirs(BACKUP_DIR)
-    files = sorted(Path(BACKUP_DIR).glob("contacts_backup_*.csv"), reverse=True)
-    return [str(p) for p in files]
+    with os.scandir(BACKUP_DIR) as it:
+        names = [e.name for e in it if e.name.startswith("contacts_backup_") and e.name.endswith(".csv")]
+    names.sort(reverse=True)
+    return [os.path.join(BACKUP_DIR, n) for n in names]
 
 
 def restore_backup() -> None:
@@ -408,7 +793,8 @@ def restore_backup() -> None:
         try:
             idx = int(choice) - 1
             sel = files[idx]
-            shutil.copy2(sel, CSV_FILE)
+            copy_file(sel, CSV_FILE)
+            _reset_cache()
             print(f"Restored backup from {sel}")
         except Exception:
             print("Invalid choice.")
@@ -423,7 +809,7 @@ def undo_last_write() -> None:
         if not prev:
             print("No previous snapshot available to undo.")
             return
-        write_contacts(prev)
+        write_contacts(prev, read_contacts())
         try:
             os.remove(PREV_SNAPSHOT)
         except Exception:
@@ -438,8 +824,7 @@ def undo_last_write() -> None:
 def export_to_json() -> None:
     try:
         contacts = read_contacts()
-        with open(JSON_FILE, "w", encoding="utf-8") as f:
-            json.dump(contacts, f, indent=4, ensure_ascii=False)
+        dump_json(JSON_FILE, contacts)
         print(f"Exported {len(contacts)} contacts to {JSON_FILE}.")
     except Exception as e:
         log_error("export_to_json", e)
@@ -451,8 +836,7 @@ def import_from_json() -> None:
         if not os.path.isfile(JSON_FILE):
             print(f"{JSON_FILE} does not exist.")
             return
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json(JSON_FILE)
         if not isinstance(data, list):
             print("Invalid JSON format.")
             return
@@ -477,7 +861,7 @@ def import_from_json() -> None:
         if confirm != "YES":
             print("Import cancelled.")
             return
-        write_contacts(normalized)
+        write_contacts(normalized, read_contacts())
         print(f"Imported {len(normalized)} contacts from {JSON_FILE}.")
     except Exception as e:
         log_error("import_from_json", e)
@@ -485,49 +869,78 @@ def import_from_json() -> None:
 
 
 def name_similarity(a: str, b: str) -> float:
+    from difflib import SequenceMatcher
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+def similar_name_pairs(names: List[str], threshold: float) -> List[Tuple[int, int, float]]:
+    """Return (i, j, similarity) for every i < j whose lowercased names score >= threshold."""
+    pairs = []
+    cd = _load_cdist()
+    if cd is not None:
+        fuzz, process, np = cd
+        names_lc = [n.lower() for n in names]
+        cutoff = threshold * 100
+        n = len(names_lc)
+        # Score SIMILARITY_BLOCK_ROWS rows at a time against the names after the
+        # block start, so memory stays O(block * n) bytes instead of O(n^2) floats.
+        for start in range(0, n, SIMILARITY_BLOCK_ROWS):
+            block = process.cdist(names_lc[start:start + SIMILARITY_BLOCK_ROWS], names_lc[start:],
+                                  scorer=fuzz.ratio, score_cutoff=cutoff, dtype=np.uint8, workers=-1)
+            for r, row in enumerate(block):
+                i = start + r
+                cols = row[r + 1:]
+                hits = range(len(cols)) if cutoff <= 0 else np.flatnonzero(cols)
+                for k in hits:
+                    pairs.append((i, i + 1 + int(k), float(cols[k]) / 100))
+        return pairs
+    for i, a in enumerate(names):
+        for j in range(i + 1, len(names)):
+            sim = name_similarity(a, names[j])
+            if sim >= threshold:
+                pairs.append((i, j, sim))
+    return pairs
+
+
 def merge_duplicates(auto_threshold: float = 0.9) -> None:
-    """Find likely duplicates by name similarity and offer merges (or auto-merge)."""
+    """Auto-merge exact duplicates (identical name, phone, email and tags), then offer merges for similar names."""
     try:
         contacts = read_contacts()
         n = len(contacts)
         if n < 2:
             print("Not enough contacts to check duplicates.")
             return
-        names = [c["name"] for c in contacts]
-        merged_any = False
+        prev = [dict(c) for c in contacts]
+        seen = {}
+        unique = []
+        for c in contacts:
+            # Only rows that agree on every field are folded silently; anything
+            # else (e.g. same name, different email) goes to the prompted stage.
+            key = _csv_row(c)[:4]
+            if key in seen:
+                merge_into(seen[key], c)
+            else:
+                seen[key] = c
+                unique.append(c)
+        exact = len(contacts) - len(unique)
+        if exact:
+            print(f"Merged {exact} identical duplicate contact(s).")
+        contacts = unique
+        merged_any = exact > 0
         used = set()
-        for i, c in enumerate(contacts):
-            if i in used: 
+        for i, j, sim in similar_name_pairs([c["name"] for c in contacts], auto_threshold):
+            if i in used or j in used:
                 continue
-            for j in range(i + 1, n):
-                if j in used:
-                    continue
-                sim = name_similarity(c["name"], contacts[j]["name"])
-                if sim >= auto_threshold:
-                    print(f"Possible duplicate:\n 1) {c['name']}  2) {contacts[j]['name']} (sim={sim:.2f})")
-                    action = input("Type M to merge, S to skip, A to always auto-merge similar > ").strip().upper()
-                    if action == "M" or action == "A":
-                        target = c
-                        src = contacts[j]
-                        if not target.get("phone") and src.get("phone"):
-                            target["phone"] = src["phone"]
-                        if not target.get("email") and src.get("email"):
-                            target["email"] = src["email"]
-                        merged_tags = set(t.strip() for t in (target.get("tags","") + "," + src.get("tags","")).split(",") if t.strip())
-                        target["tags"] = ",".join(sorted(merged_tags))
-                        target["favorite"] = target.get("favorite") or src.get("favorite")
-                        used.add(j)
-                        merged_any = True
-                        if action == "A":
-                            continue
-                    else:
-                        continue
+            c = contacts[i]
+            print(f"Possible duplicate:\n 1) {c['name']}  2) {contacts[j]['name']} (sim={sim:.2f})")
+            action = input("Type M to merge, S to skip, A to always auto-merge similar > ").strip().upper()
+            if action == "M" or action == "A":
+                merge_into(c, contacts[j])
+                used.add(j)
+                merged_any = True
         if merged_any:
             new_contacts = [contacts[i] for i in range(len(contacts)) if i not in used]
-            write_contacts(new_contacts)
+            write_contacts(new_contacts, prev)
             print("Duplicates merged and saved.")
         else:
             print("No merges performed.")
@@ -554,6 +967,7 @@ Advanced Contact Manager
 13. Merge duplicates
 14. Export selected contacts to JSON by tag/favorites
 15. Exit
+16. Export all contacts to vCard
 """)
 
 
@@ -575,8 +989,7 @@ def export_filtered_json() -> None:
             print("No contacts match filter.")
             return
         fn = input("Filename to save (default filtered_contacts.json): ").strip() or "filtered_contacts.json"
-        with open(fn, "w", encoding="utf-8") as f:
-            json.dump(sel, f, indent=2, ensure_ascii=False)
+        dump_json(fn, sel)
         print(f"Saved {len(sel)} contacts to {fn}.")
     except Exception as e:
         log_error("export_filtered_json", e)
@@ -589,7 +1002,7 @@ def main_loop() -> None:
     while True:
         try:
             show_menu()
-            choice = input("Choose an option (1-15): ").strip()
+            choice = input("Choose an option (1-16): ").strip()
             if choice == "1":
                 add_contact_interactive()
             elif choice == "2":
@@ -622,6 +1035,8 @@ def main_loop() -> None:
             elif choice == "15":
                 print("Goodbye!")
                 break
+            elif choice == "16":
+                export_all_vcards()
             else:
                 print("Invalid choice.")
         except KeyboardInterrupt: